@@ -1,10 +1,9 @@
 """Project agnostic utility functions."""
 from collections import OrderedDict, deque
 import contextlib
-from copy import deepcopy
 import csv
 from datetime import date, datetime
-from functools import wraps
+from functools import lru_cache, wraps
 import hashlib
 import io
 import logging
@@ -21,7 +20,6 @@ from jinjasql import JinjaSql
 import numpy as np
 import pandas as pd
 from pandas.tseries import offsets
-from scipy.stats import iqr
 from IPython.display import display
 import matplotlib.pyplot as plt  # NOQA
 
@@ -35,6 +33,13 @@ DEFAULT_JINJA_ENV_ARGS = dict(
 NULL_COUNT_CLAUSE = """SUM( CASE WHEN {col} IS NULL
     THEN 1 ELSE 0 END ) AS {as_col}"""
 
+# Shapes of the `str_to_datetime` formats that `datetime.fromisoformat` parses
+# identically, on every supported python version.
+ISO_DATETIME_RE = re.compile(
+    r'[0-9]{4}-[0-9]{2}-[0-9]{2}'
+    r'([ T][0-9]{2}:[0-9]{2}:[0-9]{2}|( [0-9]{2}:[0-9]{2}:[0-9]{2}\.[0-9]{1,6}))?'
+)
+
 
 def make_dirs(dir_path):
     """Add a return value to mkdir."""
@@ -43,7 +48,14 @@ def make_dirs(dir_path):
 
 
 def path_or_string(str_or_path):
-    """Load file contents as string or return input str."""
+    """Load file contents as string or return input str.
+
+    File-like objects (anything with a `read` method) are read directly, contents
+    of binary ones are decoded as UTF-8.
+    """
+    if hasattr(str_or_path, 'read'):
+        data = str_or_path.read()
+        return data.decode('utf8') if isinstance(data, bytes) else data
     file_path = Path(str_or_path)
     try:
         with file_path.open('r') as f:
@@ -205,19 +217,34 @@ def convert_to_snake_case(name: str):
 
 
 def deque_to_geo_hierarchy_dict(double_linked_list: deque, target_level: str):
-    """Converts a deque to an ordered dictionary using GEO ordered levels."""
+    """Converts a deque to an ordered dictionary using GEO ordered levels.
+
+    Only the levels up to `target_level` are visited. Each one is shallow copied
+    without its `level` key: the input deque and its dicts are not modified, but
+    nested values are shared with them.
+    """
     orde = OrderedDict()  # type: ignore # noqa
-    d = deepcopy(double_linked_list)
-    while len(d) > 0:
-        elem = d.popleft()
-        level = elem.pop('level')
-        orde[level] = elem
+    for elem in double_linked_list:
+        level = elem['level']
+        orde[level] = {k: v for k, v in elem.items() if k != 'level'}
         if target_level == level:
             return orde
 
 
 def str_to_datetime(datetime_str):
-    """Convert possible date-like string to datetime object."""
+    """Convert possible date-like string to datetime object.
+
+    Strings shaped like one of the ISO 8601 formats below go through
+    `datetime.fromisoformat`, which is much faster than trying each of the
+    `strptime` formats in turn. Anything else, including ISO 8601 variants not
+    listed in the formats, is handled by `strptime` only.
+    """
+    if ISO_DATETIME_RE.fullmatch(datetime_str):
+        try:
+            return datetime.fromisoformat(datetime_str)
+        except ValueError:
+            pass
+
     formats = (
         '%Y-%m-%d %H:%M:%S',
         '%Y-%m-%d',
@@ -346,7 +373,8 @@ def standarize_values(values):
 def robust_standarize_values(values):
     """Standarize values with InterQuartile Range and median."""
     assert np.issubdtype(values, np.number)
-    return (values - values.median()) / iqr(values)
+    iqr = np.subtract(*np.percentile(values, [75, 25]))
+    return (values - values.median()) / iqr
 
 
 def hash_str(s, length=8):
@@ -740,17 +768,8 @@ def dedup_list(li: list):
     return new_list
 
 
-def create_forecaster_dates(end_date, forecast_train_window, forecast_future_window):
-    """Process and correct all respective dates for forecaster.
-
-    Args:
-        end_date (datetime): The end date with hour precision.
-        forecast_train_window (int): The window days for past data.
-        forecast_future_window (int): The window days for future predictions.
-
-    Returns:
-        (datetime, datetime, datetime): Truple with start, end and future dates.
-    """
+def _compute_forecaster_dates(end_date, forecast_train_window, forecast_future_window):
+    """Compute forecaster dates, see `create_forecaster_dates`."""
     if not all([forecast_future_window > 0, forecast_train_window >= 0]):
         raise ValueError(
             f"Future ('{forecast_future_window}') or train "
@@ -770,6 +789,36 @@ def create_forecaster_dates(end_date, forecast_train_window, forecast_future_win
     return start_date, end_date, future_date
 
 
+_cached_forecaster_dates = lru_cache(maxsize=1024, typed=True)(
+    _compute_forecaster_dates
+)
+
+
+def create_forecaster_dates(end_date, forecast_train_window, forecast_future_window):
+    """Process and correct all respective dates for forecaster.
+
+    Results for naive end dates are memoized per argument values and types, since
+    backtests tend to request the same windows over and over. Timezone aware end
+    dates are not cached: equal instants in different timezones compare equal
+    and would share a cache entry.
+
+    Args:
+        end_date (datetime): The end date with hour precision.
+        forecast_train_window (int): The window days for past data.
+        forecast_future_window (int): The window days for future predictions.
+
+    Returns:
+        (datetime, datetime, datetime): Truple with start, end and future dates.
+    """
+    if getattr(end_date, 'tzinfo', None) is not None:
+        return _compute_forecaster_dates(
+            end_date, forecast_train_window, forecast_future_window
+        )
+    return _cached_forecaster_dates(
+        end_date, forecast_train_window, forecast_future_window
+    )
+
+
 def get_matching_columns(cols, regex_list):
     """Match a list of columns with a number of regexes."""
     ret = []
@@ -1204,29 +1253,12 @@ def category_reductor(df, categorical_col, n_levels=8, default_level='Other'):
     """
     top_levels, _ = get_ordered_factor_levels(df, categorical_col, n_levels - 1)
 
-    def sub_categorize(x, top_levels):
-        """Reduce category series levels.
-
-        Parameters
-        ----------
-        x :
-
-        top_levels :
-
-
-        Returns
-        -------
-
-        """
-        if x in top_levels:
-            return x
-        else:
-            return default_level
+    col = df[categorical_col]
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        col = col.astype(object)
 
     # Modify only non-null values
-    rv = df[categorical_col].apply(
-        lambda x: sub_categorize(x, top_levels) if (pd.notnull(x)) else x
-    )
+    rv = col.where(col.isin(top_levels) | col.isnull(), default_level)
 
     return rv
 
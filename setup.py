@@ -61,7 +61,7 @@ extra_dependencies = {
     ]
     + pyarrow_dep
     + holidays_dep,
-    'forecast': ['fbprophet', 'pystan==2.19.1.1'] + holidays_dep,
+    'forecast': ['fbprophet', 'pystan==2.19.1.1', 'scikit-learn'] + holidays_dep,
     'gsheets': ['gspread_pandas'],
 }
 
@@ -100,8 +100,6 @@ setuptools.setup(
         'pandas>=1.0.0',
         'progressbar2',
         'pyyaml',
-        'scikit-learn',
-        'scipy',
         "sqlalchemy<1.4.0,>=1.3.0",
         'numpy==1.19.5',
         'jinjasql',
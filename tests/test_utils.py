@@ -1,10 +1,11 @@
 # pylint:disable=W0611, E1101
 
-from collections import OrderedDict, deque, namedtuple  # noqa: F401
+from collections import OrderedDict, deque
+from copy import deepcopy
 import datetime
-from pathlib import Path
 from textwrap import dedent
 import io
+from itertools import islice
 
 import numpy as np
 import pandas as pd
@@ -90,10 +91,26 @@ def sample_timeseries_df():
     ],
 )
 def test_str_to_datetime(test_input, expected):
-    # Testing all posible datetime formats and the exception for wrong format
+    # Testing all posible datetime formats
     assert utils.str_to_datetime(test_input) == expected
+
+
+@pytest.mark.parametrize(
+    "test_input",
+    [
+        '25/10/2019',
+        '2019-10-25T18:35:22+00:00',
+        '2019-10-25 18:35',
+        '2019-10-25T1835',
+        '20191025T183522',
+        '2019-W43-5',
+        '2019-10-25T18:35:22.1234',
+    ],
+)
+def test_str_to_datetime_invalid_format(test_input):
+    # Unsupported formats (ISO 8601 ones included) must still raise
     with pytest.raises(ValueError):
-        utils.str_to_datetime("25/10/2019")
+        utils.str_to_datetime(test_input)
 
 
 def test_get_ordered_factor_levels():
@@ -115,38 +132,51 @@ def test_get_ordered_factor_levels():
     assert 1 == factor_levels[1]
 
 
-def test_query_yes_no(monkeypatch):
-    # Testing the possible defaults and rewriting the input for the valid or invalid inputs
-    og = utils.__builtins__["input"]
+def test_query_yes_no_invalid_default():
     with pytest.raises(ValueError):
         utils.query_yes_no("hit or miss?", 's')
-    monkeypatch.setattr('builtins.input', lambda: 'yes')
-    assert utils.query_yes_no("hit or miss?", default=None)
-    monkeypatch.setattr('builtins.input', lambda: '')
-    assert not utils.query_yes_no("hit or miss?")
-    monkeypatch.setattr('builtins.input', lambda: '')
-    assert utils.query_yes_no("hit or miss?", 'yes')
-    monkeypatch.setattr('builtins.input', lambda: 'yes')
-    assert utils.query_yes_no("hit or miss?")
-    monkeypatch.setattr('builtins.input', lambda: 'y')
-    assert utils.query_yes_no("hit or miss?")
-    monkeypatch.setattr('builtins.input', lambda: 'ye')
-    assert utils.query_yes_no("hit or miss?")
-    monkeypatch.setattr('builtins.input', lambda: 'no')
-    assert not utils.query_yes_no("hit or miss?")
-    monkeypatch.setattr('builtins.input', lambda: 'n')
-    assert not utils.query_yes_no("hit or miss?")
+
+
+# Marks the cases that call `query_yes_no` without passing `default`
+NO_DEFAULT = object()
+
+
+@pytest.mark.parametrize(
+    "answer,default,expected",
+    [
+        ('yes', None, True),
+        ('', NO_DEFAULT, False),
+        ('', 'no', False),
+        ('', 'yes', True),
+        ('yes', NO_DEFAULT, True),
+        ('y', NO_DEFAULT, True),
+        ('ye', NO_DEFAULT, True),
+        ('no', NO_DEFAULT, False),
+        ('n', NO_DEFAULT, False),
+    ],
+)
+def test_query_yes_no(monkeypatch, answer, default, expected):
+    # Rewriting the input for the valid answers under the possible defaults
+    monkeypatch.setattr('builtins.input', lambda: answer)
+    kwargs = {} if default is NO_DEFAULT else {'default': default}
+    assert utils.query_yes_no("hit or miss?", **kwargs) is expected
+
+
+def test_query_yes_no_retries_invalid_answers(monkeypatch):
     monkeypatch.setattr('builtins.input', ['y', 'miss', 'miss'].pop)
     assert utils.query_yes_no("hit or miss?")
 
-    utils.__builtins__["input"] = og
 
-
-def test_path_or_string(tmpdir):
+def test_path_or_string(tmp_path):
     # generate a tmp file for this test
-    p = tmpdir.mkdir("sub").join("test.txt")
-    p.write("True")
+    p = tmp_path / "test.txt"
+    p.write_text("True")
     assert 'True' == utils.path_or_string(p)
+    assert 'True' == utils.path_or_string(str(p))
+    assert 'True' == utils.path_or_string(io.StringIO("True"))
+    assert 'True' == utils.path_or_string(io.BytesIO(b"True"))
+    with p.open('rb') as f:
+        assert 'True' == utils.path_or_string(f)
     assert 'show me what you got' == utils.path_or_string("show me what you got")
 
 
@@ -154,31 +184,31 @@ def test_hash_str():
     assert '0c5024ed' == utils.hash_str("hit or miss")
 
 
-def test_deque_to_geo_hierarchy_dict():
-    # Testing the creation of the orderedDict for the 4 levels
-    lst = [
-        {'level': 'National', 'select_clause': '', 'group_clause': ''},
-        {
-            'level': 'Provincial',
-            'select_clause': "existence is pain",
-            'post_join_select': 'province_name,',
-            'group_clause': '1,',
-        },
-        {
-            'level': 'Departamental',
-            'select_clause': "existence is pain",
-            'post_join_select': 'departament_name,',
-            'group_clause': '2,',
-        },
-        {
-            'level': 'Local',
-            'select_clause': "existence is pain",
-            'post_join_select': 'locality_name,',
-            'group_clause': '3,',
-        },
-    ]
-    deque_lst = deque(lst)
-    cont_lst = [
+GEO_HIERARCHY_LEVELS = [
+    {'level': 'National', 'select_clause': '', 'group_clause': ''},
+    {
+        'level': 'Provincial',
+        'select_clause': "existence is pain",
+        'post_join_select': 'province_name,',
+        'group_clause': '1,',
+    },
+    {
+        'level': 'Departamental',
+        'select_clause': "existence is pain",
+        'post_join_select': 'departament_name,',
+        'group_clause': '2,',
+    },
+    {
+        'level': 'Local',
+        'select_clause': "existence is pain",
+        'post_join_select': 'locality_name,',
+        'group_clause': '3,',
+    },
+]
+
+
+FULL_HIERARCHY = OrderedDict(
+    [
         ('National', {'select_clause': '', 'group_clause': ''}),
         (
             'Provincial',
@@ -205,19 +235,28 @@ def test_deque_to_geo_hierarchy_dict():
             },
         ),
     ]
+)
 
-    assert OrderedDict(cont_lst[:1]) == utils.deque_to_geo_hierarchy_dict(
-        deque_lst, 'National'
-    )
-    assert OrderedDict(cont_lst[:2]) == utils.deque_to_geo_hierarchy_dict(
-        deque_lst, 'Provincial'
-    )
-    assert OrderedDict(cont_lst[:3]) == utils.deque_to_geo_hierarchy_dict(
-        deque_lst, 'Departamental'
-    )
-    assert OrderedDict(cont_lst[:]) == utils.deque_to_geo_hierarchy_dict(
-        deque_lst, 'Local'
+
+@pytest.fixture(scope='module')
+def geo_hierarchy_deque():
+    # Deep copies, so mutations of the deque elements don't reach the constant
+    return deque(deepcopy(GEO_HIERARCHY_LEVELS))
+
+
+@pytest.mark.parametrize(
+    "target_level", ['National', 'Provincial', 'Departamental', 'Local'],
+)
+def test_deque_to_geo_hierarchy_dict(geo_hierarchy_deque, target_level):
+    # Testing the creation of the orderedDict for each of the 4 levels
+    n_levels = list(FULL_HIERARCHY).index(target_level) + 1
+    expected = OrderedDict(islice(FULL_HIERARCHY.items(), n_levels))
+
+    assert expected == utils.deque_to_geo_hierarchy_dict(
+        geo_hierarchy_deque, target_level
     )
+    # The input deque must be left untouched
+    assert list(geo_hierarchy_deque) == GEO_HIERARCHY_LEVELS
 
 
 def test_df_info_to_str():
@@ -749,6 +788,40 @@ def test_create_forecaster_dates(ed, tw, fw, expected):
     assert utils.create_forecaster_dates(ed, tw, fw) == expected
 
 
+def test_create_forecaster_dates_cache():
+    # Repeated calls with the same arguments are served from the cache
+    utils._cached_forecaster_dates.cache_clear()
+    first = utils.create_forecaster_dates('2019-10-25', 2, 3)
+    second = utils.create_forecaster_dates('2019-10-25', 2, 3)
+    assert first is second
+    assert utils._cached_forecaster_dates.cache_info().hits == 1
+    assert second == utils._compute_forecaster_dates('2019-10-25', 2, 3)
+
+    # Equal values of different types are cached separately
+    rv = utils.create_forecaster_dates(datetime.datetime(2019, 10, 25), 2, 3)
+    assert isinstance(rv[1], datetime.datetime)
+    assert not isinstance(rv[1], pd.Timestamp)
+    assert rv == utils._compute_forecaster_dates(datetime.datetime(2019, 10, 25), 2, 3)
+    rv = utils.create_forecaster_dates(pd.Timestamp('2019-10-25'), 2, 3)
+    assert isinstance(rv[1], pd.Timestamp)
+    assert rv == utils._compute_forecaster_dates(pd.Timestamp('2019-10-25'), 2, 3)
+
+
+def test_create_forecaster_dates_timezone_aware():
+    # Equal instants in different timezones keep the caller's timezone
+    utc_ed = datetime.datetime(2019, 10, 25, tzinfo=datetime.timezone.utc)
+    art = datetime.timezone(datetime.timedelta(hours=-3))
+    art_ed = datetime.datetime(2019, 10, 24, 21, tzinfo=art)
+    assert utc_ed == art_ed
+
+    utc_rv = utils.create_forecaster_dates(utc_ed, 2, 3)
+    art_rv = utils.create_forecaster_dates(art_ed, 2, 3)
+    assert utc_rv[1].tzinfo == datetime.timezone.utc
+    assert art_rv[1].tzinfo == art
+    assert art_rv[1].hour == 21
+    assert all(d.utcoffset() == art.utcoffset(None) for d in art_rv)
+
+
 def test_same_dataframe():
     df_x = get_first_df_diff_deviations_functions()
     df_y = get_first_df_diff_deviations_functions()
@@ -1005,6 +1078,12 @@ def test_category_reductor(sample_df):
     df = utils.category_reductor(sample_df, 'robin').copy()
     assert df.describe()['unique'] == 8
 
+    # Null values are kept as is and categorical columns are supported
+    df = pd.DataFrame({'col': pd.Categorical(['a', 'a', 'b', 'c', None])})
+    rv = utils.category_reductor(df, 'col', n_levels=2, default_level='Other')
+    assert rv.tolist()[:4] == ['a', 'a', 'Other', 'Other']
+    assert pd.isnull(rv.iloc[4])
+
 
 def test_load_sql_query(tmp_path):
     sql_tpl = (